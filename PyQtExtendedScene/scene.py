@@ -1,10 +1,50 @@
+import inspect
 from enum import auto, Enum
-from typing import List, Optional
-from PyQt5.QtCore import pyqtSignal, QPoint, QPointF, QRectF, Qt
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from PyQt5.QtCore import pyqtSignal, QPoint, QPointF, QRectF, Qt, QTimer
 from PyQt5.QtGui import QBrush, QColor, QMouseEvent, QPainter, QPixmap, QResizeEvent, QWheelEvent
 from PyQt5.QtWidgets import QFrame, QGraphicsItem, QGraphicsPixmapItem, QGraphicsScene, QGraphicsView, QWidget
 
 
+def _get_selection_state(signature: inspect.Signature, *args, **kwargs) -> bool:
+    """
+    :param signature: signature of select method of the component;
+    :param args: positional arguments of the call of select method (the first one is the component);
+    :param kwargs: keyword arguments of the call of select method.
+    :return: selection state that was passed to select method.
+    """
+
+    bound_arguments = signature.bind(*args, **kwargs)
+    bound_arguments.apply_defaults()
+    # The first parameter after the component is the selection state, whatever its name is
+    parameters = list(signature.parameters.values())[1:]
+    if not parameters or parameters[0].kind is inspect.Parameter.VAR_KEYWORD:
+        return kwargs.get("selected", True)
+    if parameters[0].kind is inspect.Parameter.VAR_POSITIONAL:
+        return args[1] if len(args) > 1 else kwargs.get("selected", True)
+    return bound_arguments.arguments[parameters[0].name]
+
+
+def _track_selection(select: Callable) -> Callable:
+    """
+    :param select: select method of the component.
+    :return: select method that also reports the new selection state of the component to the scene.
+    """
+
+    signature = inspect.signature(select)
+
+    @wraps(select)
+    def wrapper(*args, **kwargs):
+        selected = _get_selection_state(signature, *args, **kwargs)
+        result = select(*args, **kwargs)
+        args[0]._extended_scene_notify_selection(bool(selected))
+        return result
+
+    wrapper._extended_scene_tracks_selection = True
+    return wrapper
+
+
 class AbstractComponent(QGraphicsItem):
     """
     Abstract component for extended scene.
@@ -22,6 +62,18 @@ class AbstractComponent(QGraphicsItem):
         self._draggable: bool = draggable
         self._selectable: bool = selectable
         self._unique_selection: bool = unique_selection
+        self.__selected: bool = False
+        self.__selection_listener: Optional[Callable[[AbstractComponent, bool], None]] = None
+        if type(self).paint is AbstractComponent.paint:
+            # Component is drawn by its children items only, so the scene does not need to call paint
+            self.setFlag(QGraphicsItem.ItemHasNoContents, True)
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # Selection made by overridden (or inherited from a mixin) select method must be known to the scene, whoever
+        # calls it
+        if not getattr(cls.select, "_extended_scene_tracks_selection", False):
+            cls.select = _track_selection(cls.select)
 
     @property
     def draggable(self) -> bool:
@@ -47,6 +99,31 @@ class AbstractComponent(QGraphicsItem):
 
         return self._unique_selection
 
+    def _extended_scene_is_selected(self) -> bool:
+        """
+        :return: True if the component was selected by the last call of select method.
+        """
+
+        return self.__selected
+
+    def _extended_scene_notify_selection(self, selected: bool) -> None:
+        """
+        :param selected: new selection state of the component.
+        """
+
+        self.__selected = selected
+        if self.__selection_listener is not None:
+            self.__selection_listener(self, selected)
+
+    def _extended_scene_set_selection_listener(self, listener: Optional[Callable[["AbstractComponent", bool], None]]
+                                               ) -> None:
+        """
+        :param listener: function to be called with the component and its new selection state when the component
+        is selected or deselected.
+        """
+
+        self.__selection_listener = listener
+
     def boundingRect(self) -> QRectF:
         """
         :return: the outer bounds of the component as a rectangle.
@@ -61,10 +138,14 @@ class AbstractComponent(QGraphicsItem):
         :param option: style options for the component, such as its state, exposed area and its level-of-detail hints;
         :param widget: widget argument is optional. If provided, it points to the widget that is being painted on;
         otherwise, it is None.
+
+        Note: the scene does not save painter state around paint calls, so any changes of painter state (pen, brush,
+        transformation, etc.) must be restored by the component itself.
         """
 
         pass
 
+    @_track_selection
     def select(self, selected: bool = True) -> None:
         """
         :param selected: if True, then set the component as selected.
@@ -88,6 +169,7 @@ class ExtendedScene(QGraphicsView):
     on_right_click = pyqtSignal(QPointF)
     on_middle_click = pyqtSignal()
 
+    frame_interval = 16  # ms
     minimum_scale = 0.1
 
     class DragState(Enum):
@@ -106,13 +188,35 @@ class ExtendedScene(QGraphicsView):
         self._scale: float = 1.0
         self._zoom_speed: float = zoom_speed
 
-        self._components: List[AbstractComponent] = []
+        # Components are stored by their ids, so that removing does not scan all components
+        self._components: Dict[int, AbstractComponent] = {}
+        # Components grouped by every class in their MRO, so that filtering by class does not scan all components
+        self._components_by_class: Dict[type, Dict[int, AbstractComponent]] = {}
         self._current_component: Optional[AbstractComponent] = None
+        self._selected_components: Set[AbstractComponent] = set()
+        # Components that override update_scale, other components do not need to be rescaled
+        self._scaled_components: Dict[int, AbstractComponent] = {}
         self._drag_allowed: bool = True
         self._drag_state: ExtendedScene.DragState = ExtendedScene.DragState.no_drag
         self._start_pos: Optional[QPointF] = None
+        self._render_hints: Optional[QPainter.RenderHints] = None
+
+        # Mouse moves may come more often than the scene is repainted, so dragged component is moved to the last
+        # position of the mouse at most once per frame
+        self._component_pos: Optional[QPointF] = None
+        self._component_pos_timer: QTimer = QTimer(self)
+        self._component_pos_timer.setSingleShot(True)
+        self._component_pos_timer.setInterval(self.frame_interval)
+        self._component_pos_timer.timeout.connect(self._move_current_component)
+
+        # Wheel events may come several times per event loop iteration, so components are rescaled only once
+        self._scale_update_timer: QTimer = QTimer(self)
+        self._scale_update_timer.setSingleShot(True)
+        self._scale_update_timer.setInterval(0)
+        self._scale_update_timer.timeout.connect(self._update_components_scale)
 
         self._scene: QGraphicsScene = QGraphicsScene()
+        self._scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
         self._background: Optional[QGraphicsPixmapItem] = self._scene.addPixmap(background) if background else None
         self.setScene(self._scene)
 
@@ -121,7 +225,14 @@ class ExtendedScene(QGraphicsView):
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setBackgroundBrush(QBrush(QColor(0, 0, 0)))
+        # Opaque background brush covers the whole viewport, so there is no need to erase it before painting
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
+        self.viewport().setAttribute(Qt.WA_OpaquePaintEvent, True)
         self.setFrameShape(QFrame.NoFrame)
+        # Calculating minimal updated region costs more than repainting the viewport when there are many components
+        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # Components must restore painter state changed in their paint methods
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing)
         # Mouse
         self.setMouseTracking(True)
         # For keyboard events
@@ -133,19 +244,84 @@ class ExtendedScene(QGraphicsView):
         :return: a component that is located at the point specified by the mouse.
         """
 
-        for item in self.items(event.pos()):
+        item = self.itemAt(event.pos())
+        # Child item of the component (e.g. ellipse item) may be under the mouse
+        while item is not None:
             if isinstance(item, AbstractComponent):
                 return item
+            item = item.parentItem()
         return None
 
+    def _disable_render_hints(self) -> None:
+        """
+        Disables render hints (e.g. antialiasing) while the scene or component is dragged.
+        """
+
+        if self._render_hints is None:
+            self._render_hints = self.renderHints()
+            self.setRenderHints(QPainter.RenderHints())
+
+    def _move_current_component(self) -> None:
+        """
+        Moves dragged component to the last position of the mouse.
+        """
+
+        self._component_pos_timer.stop()
+        if self._current_component is not None and self._component_pos is not None:
+            self._current_component.setPos(self._component_pos)
+        self._component_pos = None
+
+    def _restore_render_hints(self) -> None:
+        """
+        Restores render hints that were set before the scene or component was dragged.
+        """
+
+        if self._render_hints is not None:
+            self.setRenderHints(self._render_hints)
+            self._render_hints = None
+
+    def _on_component_selection(self, component: AbstractComponent, selected: bool) -> None:
+        """
+        :param component: component whose selection was changed;
+        :param selected: new selection state of the component.
+        """
+
+        if selected:
+            self._selected_components.add(component)
+        else:
+            self._selected_components.discard(component)
+
+    def _update_components_scale(self) -> None:
+        """
+        Updates scale of the components that depend on the scale of the scene.
+        """
+
+        for component in self._scaled_components.values():
+            component.update_scale(self._scale)
+
     def add_component(self, component: AbstractComponent) -> None:
         """
         :param component: component to be added to the scene.
         """
 
-        self._components.append(component)
+        self._components[id(component)] = component
+        for cls in type(component).__mro__:
+            self._components_by_class.setdefault(cls, {})[id(component)] = component
         self._scene.addItem(component)
-        component.update_scale(self._scale)
+        component._extended_scene_set_selection_listener(self._on_component_selection)
+        if component._extended_scene_is_selected():
+            self._selected_components.add(component)
+        if type(component).update_scale is not AbstractComponent.update_scale:
+            self._scaled_components[id(component)] = component
+            component.update_scale(self._scale)
+
+    def add_components(self, components: Iterable[AbstractComponent]) -> None:
+        """
+        :param components: components to be added to the scene.
+        """
+
+        for component in components:
+            self.add_component(component)
 
     def all_components(self, class_filter: type = object) -> List[AbstractComponent]:
         """
@@ -153,7 +329,10 @@ class ExtendedScene(QGraphicsView):
         :return: list of components that match a given filter.
         """
 
-        return list(filter(lambda x: isinstance(x, class_filter), self._components))
+        if not isinstance(class_filter, type) or type(class_filter).__instancecheck__ is not type.__instancecheck__:
+            # For example, a tuple of classes or an ABC with registered virtual subclasses that are not in MRO
+            return list(filter(lambda x: isinstance(x, class_filter), self._components.values()))
+        return list(self._components_by_class.get(class_filter, {}).values())
 
     def allow_drag(self, allow: bool = True) -> None:
         """
@@ -163,8 +342,16 @@ class ExtendedScene(QGraphicsView):
         self._drag_allowed = allow
 
     def clear_scene(self) -> None:
+        self._component_pos_timer.stop()
+        self._component_pos = None
+        self._current_component = None
+        for component in self._components.values():
+            component._extended_scene_set_selection_listener(None)
         self._scene.clear()
-        self._components = []
+        self._components = {}
+        self._components_by_class = {}
+        self._scaled_components = {}
+        self._selected_components.clear()
         self._background = None
         self.resetTransform()
 
@@ -180,11 +367,17 @@ class ExtendedScene(QGraphicsView):
         :param event: mouse event.
         """
 
-        if self._drag_state == self.DragState.drag:
+        if self._drag_state is not self.DragState.no_drag:
+            # Render hints are disabled only when dragging really starts, not on every click
+            self._disable_render_hints()
+
+        if self._drag_state is self.DragState.drag:
             delta = self.mapToScene(event.pos()) - self._start_pos
             self.move(delta)
-        elif self._drag_state == self.DragState.drag_component:
-            self._current_component.setPos(self.mapToScene(event.pos()))
+        elif self._drag_state is self.DragState.drag_component:
+            self._component_pos = self.mapToScene(event.pos())
+            if not self._component_pos_timer.isActive():
+                self._component_pos_timer.start()
 
     def mousePressEvent(self, event: QMouseEvent) -> None:
         """
@@ -233,10 +426,12 @@ class ExtendedScene(QGraphicsView):
             self.setDragMode(QGraphicsView.NoDrag)
 
             if self._drag_state is self.DragState.drag_component:
+                self._move_current_component()
                 if self._current_component:
                     self.on_component_moved.emit(self._current_component)
 
             self._drag_state = self.DragState.no_drag
+            self._restore_render_hints()
 
     def move(self, delta: QPoint) -> None:
         """
@@ -252,15 +447,26 @@ class ExtendedScene(QGraphicsView):
         self.setTransformationAnchor(anchor)  # Restore old anchor
 
     def remove_all_selections(self) -> None:
-        for item in self._components:
+        """
+        Removes selection from all selected components of the scene.
+        """
+
+        for item in list(self._selected_components):
             item.select(False)
+        self._selected_components.clear()
 
     def remove_component(self, component: AbstractComponent) -> None:
         """
         :param component: component to be removed from the scene.
         """
 
-        self._components.remove(component)
+        if self._components.pop(id(component), None) is None:
+            raise ValueError("Component is not on the scene")
+        for cls in type(component).__mro__:
+            del self._components_by_class[cls][id(component)]
+        self._scaled_components.pop(id(component), None)
+        component._extended_scene_set_selection_listener(None)
+        self._selected_components.discard(component)
         self._scene.removeItem(component)
 
     def resizeEvent(self, event: QResizeEvent) -> None:
@@ -297,14 +503,16 @@ class ExtendedScene(QGraphicsView):
 
         zoom_factor = 1.0
         zoom_factor += event.angleDelta().y() * self._zoom_speed
+        if zoom_factor == 1.0:  # e.g. horizontal scrolling
+            event.ignore()
+            return
+
         if self._scale * zoom_factor < self.minimum_scale and zoom_factor < 1.0:  # minimum allowed zoom
             return
 
         self.zoom(zoom_factor, event.pos())
         self._scale *= zoom_factor
-
-        for component in self._components:
-            component.update_scale(self._scale)
+        self._scale_update_timer.start()
 
     def zoom(self, zoom_factor: float, pos: QPoint) -> None:  # pos in view coordinates
         """
@@ -2,7 +2,7 @@ import os
 import sys
 from PyQt5.QtCore import QPointF, QRectF
 from PyQt5.QtGui import QBrush, QColor, QPixmap
-from PyQt5.QtWidgets import QApplication, QFileDialog, QGraphicsEllipseItem
+from PyQt5.QtWidgets import QApplication, QFileDialog, QGraphicsEllipseItem, QGraphicsItem
 from PyQtExtendedScene import AbstractComponent, ExtendedScene
 
 
@@ -11,6 +11,8 @@ class MyComponent(AbstractComponent):
 
     normal_size = 10
     selected_size = 20
+    # One brush is shared by all components instead of creating it for every component
+    brush = QBrush(QColor(0xFFFF00))
 
     def __init__(self, x: float, y: float, description: str = "") -> None:
         """
@@ -29,7 +31,9 @@ class MyComponent(AbstractComponent):
         # We must describe how to draw our own component. Our own component will be just a circle
         self._item = QGraphicsEllipseItem(-self._r, -self._r, self._r * 2, self._r * 2, self)
         # ... yellow circle
-        self._item.setBrush(QBrush(QColor(0xFFFF00)))
+        self._item.setBrush(self.brush)
+        # Circle is rendered once to a pixmap and then just blitted when the scene is moved
+        self._item.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
     @property
     # That is our own property
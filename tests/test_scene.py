@@ -1,17 +1,42 @@
 import os
 import sys
 import unittest
-from typing import List
-from PyQt5.QtCore import QPointF, QRectF
-from PyQt5.QtGui import QBrush, QColor, QPixmap
-from PyQt5.QtWidgets import QApplication, QGraphicsEllipseItem
+from abc import ABC
+from functools import lru_cache
+from typing import List, Optional
+from PyQt5.QtCore import QEvent, QPoint, QPointF, QRectF, Qt
+from PyQt5.QtGui import QBrush, QColor, QMouseEvent, QPainter, QPixmap, QWheelEvent
+from PyQt5.QtWidgets import QApplication, QGraphicsEllipseItem, QGraphicsItem
 from PyQtExtendedScene import AbstractComponent, ExtendedScene
 
 
+DATA_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SIMPLE_COMPONENT_DESCRIPTIONS = tuple(f"simple component {i}" for i in range(5))
+_app: Optional[QApplication] = None
+
+
+@lru_cache(maxsize=None)
+def get_background(file_name: str) -> QPixmap:
+    """
+    :param file_name: name of image file in test data directory.
+    :return: pixmap with the image. Image is loaded only once for all tests.
+    """
+
+    return QPixmap(os.path.join(DATA_DIR, file_name))
+
+
+def setUpModule() -> None:
+    global _app
+    _app = QApplication.instance() or QApplication(sys.argv)
+
+
 class SimpleComponent(AbstractComponent):
 
     NORMAL_SIZE: float = 10
     SELECTED_SIZE: float = 20
+    NORMAL_RECT: QRectF = QRectF(-NORMAL_SIZE, -NORMAL_SIZE, 2 * NORMAL_SIZE, 2 * NORMAL_SIZE)
+    SELECTED_RECT: QRectF = QRectF(-SELECTED_SIZE, -SELECTED_SIZE, 2 * SELECTED_SIZE, 2 * SELECTED_SIZE)
+    BRUSH: QBrush = QBrush(QColor(0xFFFF00))
 
     def __init__(self, x: float, y: float, description: str = "") -> None:
         """
@@ -22,10 +47,11 @@ class SimpleComponent(AbstractComponent):
 
         super().__init__(draggable=True, selectable=True, unique_selection=True)
         self._description: str = description
-        self._r: float = SimpleComponent.NORMAL_SIZE
+        self.selected: bool = False
         self.setPos(QPointF(x, y))
-        self._item = QGraphicsEllipseItem(-self._r, -self._r, self._r * 2, self._r * 2, self)
-        self._item.setBrush(QBrush(QColor(0xFFFF00)))
+        self._item = QGraphicsEllipseItem(SimpleComponent.NORMAL_RECT, self)
+        self._item.setBrush(SimpleComponent.BRUSH)
+        self._item.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
     @property
     def description(self) -> str:
@@ -36,56 +62,83 @@ class SimpleComponent(AbstractComponent):
         return self._description
 
     def select(self, selected: bool = True) -> None:
-        self._r = SimpleComponent.SELECTED_SIZE if selected else SimpleComponent.NORMAL_SIZE
-        self._item.setRect(QRectF(-self._r, -self._r, self._r * 2, self._r * 2))
+        self.selected = selected
+        self._item.setRect(SimpleComponent.SELECTED_RECT if selected else SimpleComponent.NORMAL_RECT)
 
 
 class OtherComponent(AbstractComponent):
     pass
 
 
-class TestExtendedScene(unittest.TestCase):
+class SelectMixin:
+
+    def select(self, value: bool = False, animate: bool = False) -> None:
+        self.selected = value
+        self.animated = animate
+
+
+class MixinComponent(SelectMixin, AbstractComponent):
 
-    @classmethod
-    def setUpClass(cls) -> None:
-        cls._app: QApplication = QApplication(sys.argv)
+    def __init__(self) -> None:
+        super().__init__()
+        self._is_selected: bool = False
+        self.selected: bool = False
+        self.animated: bool = False
+
+
+class Tag(ABC):
+    pass
+
+
+Tag.register(OtherComponent)
+
+
+class ScaledComponent(AbstractComponent):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.scales: List[float] = []
+
+    def update_scale(self, scale: float) -> None:
+        self.scales.append(scale)
+
+
+class TestExtendedScene(unittest.TestCase):
 
     def setUp(self) -> None:
-        path = os.path.join(os.path.dirname(__file__), "data", "background_1.png")
-        background = QPixmap(path)
-        self.scene: ExtendedScene = ExtendedScene(background)
-
-        self.simple_components: List[SimpleComponent] = []
-        for i in range(5):
-            component = SimpleComponent(i, i, f"simple component {i}")
-            self.scene.add_component(component)
-            self.simple_components.append(component)
-
-        self.other_components: List[OtherComponent] = []
-        for i in range(7):
-            component = OtherComponent()
-            self.scene.add_component(component)
-            self.other_components.append(component)
+        self.scene: ExtendedScene = ExtendedScene(get_background("background_1.png"))
+
+        self.simple_components: List[SimpleComponent] = [SimpleComponent(i, i, description) for i, description
+                                                         in enumerate(SIMPLE_COMPONENT_DESCRIPTIONS)]
+        self.scene.add_components(self.simple_components)
+
+        self.other_components: List[OtherComponent] = [OtherComponent() for _ in range(7)]
+        self.scene.add_components(self.other_components)
 
     def test_add_component_and_all_components(self) -> None:
         self.assertEqual(len(self.scene.all_components()), 12)
 
-        simple_components_from_scene = self.scene.all_components(SimpleComponent)
-        self.assertEqual(len(simple_components_from_scene), 5)
-        for i, component in enumerate(simple_components_from_scene):
-            self.assertEqual(component, self.simple_components[i])
+        self.assertListEqual(self.scene.all_components(SimpleComponent), self.simple_components)
+        self.assertListEqual(self.scene.all_components(OtherComponent), self.other_components)
+
+    def test_all_components_with_abc_filter(self) -> None:
+        self.assertListEqual(self.scene.all_components(Tag), self.other_components)
+
+    def test_add_components(self) -> None:
+        components = [SimpleComponent(i, -i) for i in range(3)]
+        self.scene.add_components(components)
 
-        other_components_from_scene = self.scene.all_components(OtherComponent)
-        self.assertEqual(len(other_components_from_scene), 7)
-        for i, component in enumerate(other_components_from_scene):
-            self.assertEqual(component, self.other_components[i])
+        self.assertEqual(self.scene.all_components(SimpleComponent)[-3:], components)
+        self.assertEqual(len(self.scene.all_components()), 15)
 
     def test_allow_drag_and_is_drag_allowed(self) -> None:
-        scene = ExtendedScene()
-        self.assertTrue(scene.is_drag_allowed())
+        self.assertTrue(self.scene.is_drag_allowed())
+
+        self.scene.allow_drag(False)
+        self.assertFalse(self.scene.is_drag_allowed())
 
-        scene.allow_drag(False)
-        self.assertFalse(scene.is_drag_allowed())
+        self.scene.allow_drag(True)
+        self.assertTrue(self.scene.is_drag_allowed())
 
     def test_clear_scene(self) -> None:
         self.assertEqual(len(self.scene.all_components()), 12)
@@ -95,13 +148,128 @@ class TestExtendedScene(unittest.TestCase):
         self.assertEqual(len(self.scene.all_components()), 0)
         self.assertIsNone(self.scene._background)
 
+        # New background can be set after clearing the scene
+        self.scene.set_background(get_background("background_2.png"))
+        self.assertIsNotNone(self.scene._background)
+
+    def test_mouse_press_selects_component(self) -> None:
+        self.scene.setSceneRect(QRectF(-500, -500, 1000, 1000))
+        component_1 = SimpleComponent(-100, -100)
+        component_2 = SimpleComponent(100, 100)
+        self.scene.add_component(component_1)
+        self.scene.add_component(component_2)
+
+        for component in (component_1, component_2):
+            pos = self.scene.mapFromScene(component.pos())
+            event = QMouseEvent(QEvent.MouseButtonPress, QPointF(pos), Qt.LeftButton, Qt.LeftButton, Qt.NoModifier)
+            self.scene.mousePressEvent(event)
+            self.assertTrue(component.selected)
+        self.assertFalse(component_1.selected)
+
+    def test_mouse_drag_moves_component(self) -> None:
+        self.scene.setSceneRect(QRectF(-500, -500, 1000, 1000))
+        component = SimpleComponent(-100, -100)
+        self.scene.add_component(component)
+        moved_components = []
+        self.scene.on_component_moved.connect(moved_components.append)
+
+        pos = QPointF(self.scene.mapFromScene(component.pos()))
+        self.scene.mousePressEvent(QMouseEvent(QEvent.MouseButtonPress, pos, Qt.LeftButton, Qt.LeftButton,
+                                               Qt.NoModifier))
+        for dx in (10, 20, 30):
+            self.scene.mouseMoveEvent(QMouseEvent(QEvent.MouseMove, pos + QPointF(dx, 0), Qt.NoButton, Qt.LeftButton,
+                                                  Qt.NoModifier))
+        self.scene.mouseReleaseEvent(QMouseEvent(QEvent.MouseButtonRelease, pos + QPointF(30, 0), Qt.LeftButton,
+                                                 Qt.NoButton, Qt.NoModifier))
+
+        self.assertEqual(moved_components, [component])
+        self.assertEqual(component.pos(), self.scene.mapToScene((pos + QPointF(30, 0)).toPoint()))
+
+    def test_render_hints_restored_after_drag(self) -> None:
+        hints = self.scene.renderHints() | QPainter.Antialiasing
+        self.scene.setRenderHints(hints)
+        pos = QPointF(self.scene.mapFromScene(QPointF(1000, 1000)))
+
+        self.scene.mousePressEvent(QMouseEvent(QEvent.MouseButtonPress, pos, Qt.LeftButton, Qt.LeftButton,
+                                               Qt.NoModifier))
+        self.assertEqual(self.scene.renderHints(), hints)
+        self.scene.mouseMoveEvent(QMouseEvent(QEvent.MouseMove, pos + QPointF(10, 0), Qt.NoButton, Qt.LeftButton,
+                                              Qt.NoModifier))
+        self.assertEqual(int(self.scene.renderHints()), 0)
+        self.scene.mouseReleaseEvent(QMouseEvent(QEvent.MouseButtonRelease, pos + QPointF(10, 0), Qt.LeftButton,
+                                                 Qt.NoButton, Qt.NoModifier))
+        self.assertEqual(self.scene.renderHints(), hints)
+
+    def test_remove_all_selections(self) -> None:
+        component = SimpleComponent(0, 0)
+        component.select(True)
+        self.scene.add_component(component)
+        self.simple_components[0].select(True)
+        self.simple_components[1].select(True)
+        self.simple_components[1].select(False)
+
+        self.scene.remove_all_selections()
+        self.assertFalse(component.selected)
+        self.assertFalse(self.simple_components[0].selected)
+
+    def test_remove_all_selections_with_select_from_mixin(self) -> None:
+        components = [MixinComponent() for _ in range(2)]
+        self.scene.add_components(components)
+
+        components[0].select(True, animate=True)
+        self.assertTrue(components[0].animated)
+        components[1].select(value=True)
+        components[1].select()
+        self.assertFalse(components[1].selected)
+
+        self.scene.remove_all_selections()
+        self.assertFalse(components[0].selected)
+
+    def test_remove_component(self) -> None:
+        self.scene.remove_component(self.simple_components[1])
+        self.scene.remove_component(self.other_components[0])
+
+        self.assertEqual(len(self.scene.all_components()), 10)
+        self.assertEqual(self.scene.all_components(SimpleComponent),
+                         [self.simple_components[0]] + self.simple_components[2:])
+        self.assertEqual(self.scene.all_components(OtherComponent), self.other_components[1:])
+        self.assertEqual(len(self.scene.all_components((SimpleComponent, OtherComponent))), 10)
+
     def test_set_background(self) -> None:
-        path = os.path.join(os.path.dirname(__file__), "data", "background_2.png")
-        background = QPixmap(path)
+        background = get_background("background_2.png")
 
         with self.assertRaises(ValueError):
             self.scene.set_background(background)
 
-        self.scene.clear_scene()
-        self.scene.set_background(background)
-        self.assertIsNotNone(self.scene._background)
+        scene = ExtendedScene()
+        scene.set_background(background)
+        self.assertIsNotNone(scene._background)
+
+    def test_wheel_event_updates_scale_once(self) -> None:
+        component = ScaledComponent()
+        self.scene.add_component(component)
+        self.assertEqual(component.scales, [1.0])
+
+        for _ in range(3):
+            event = QWheelEvent(QPointF(0, 0), QPointF(0, 0), QPoint(0, 0), QPoint(0, 120), Qt.NoButton,
+                                Qt.NoModifier, Qt.NoScrollPhase, False)
+            self.scene.wheelEvent(event)
+        self.assertEqual(len(component.scales), 1)
+
+        QApplication.processEvents()
+        self.assertEqual(len(component.scales), 2)
+        self.assertAlmostEqual(component.scales[-1], 1.12 ** 3)
+
+    def test_wheel_event_without_vertical_delta_is_ignored(self) -> None:
+        component = ScaledComponent()
+        self.scene.add_component(component)
+        transform = self.scene.transform()
+
+        event = QWheelEvent(QPointF(0, 0), QPointF(0, 0), QPoint(0, 0), QPoint(120, 0), Qt.NoButton, Qt.NoModifier,
+                            Qt.NoScrollPhase, False)
+        self.scene.wheelEvent(event)
+        QApplication.processEvents()
+
+        self.assertFalse(event.isAccepted())
+        self.assertEqual(self.scene.transform(), transform)
+        self.assertEqual(component.scales, [1.0])